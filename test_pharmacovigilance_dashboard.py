@@ -0,0 +1,120 @@
+import sqlite3
+
+import numpy as np
+import pytest
+
+from pharmacovigilance_dashboard import PharmacovgilanceDashboard
+
+
+@pytest.fixture
+def dashboard():
+    dashboard = PharmacovgilanceDashboard(db_path=':memory:')
+    dashboard.initialize_database()
+    yield dashboard
+    dashboard.close()
+
+
+def test_analyze_adherence_trends_patient_without_medications(dashboard):
+    dashboard.cursor.execute('''
+        INSERT INTO patients (patient_id, age, gender, condition_id, registration_date)
+        VALUES (1000, 40, 'F', 1, 0)
+    ''')
+    dashboard.populate_synthetic_data(n_patients=20)
+
+    df = dashboard.analyze_adherence_trends()
+    patient = df[df['patient_id'] == 1000].iloc[0]
+    assert patient['num_medications'] == 0
+    assert np.isnan(patient['avg_adherence'])
+    assert len(df) == 21
+
+
+def test_populate_synthetic_data_rolls_back_on_failure(dashboard):
+    dashboard.populate_synthetic_data(n_patients=10)
+    counts = dashboard.cursor.execute('SELECT COUNT(*) FROM adherence').fetchone()
+
+    # Re-using the same patient ids fails partway through the load
+    with pytest.raises(sqlite3.IntegrityError):
+        dashboard.populate_synthetic_data(n_patients=20)
+
+    assert not dashboard.conn.in_transaction
+    assert dashboard.cursor.execute('SELECT COUNT(*) FROM adherence').fetchone() == counts
+    assert dashboard.cursor.execute('SELECT COUNT(*) FROM patients').fetchone() == (10,)
+
+
+def test_numba_dose_kernel_statistics():
+    pytest.importorskip('numba')
+    from pharmacovigilance_dashboard import _numba_dose_kernel
+
+    n_meds, n_days = 200_000, 30
+    rng = np.random.default_rng(7)
+    doses = np.empty((n_meds, n_days), dtype=np.int8)
+    _numba_dose_kernel()(doses, rng.integers(0, 2**64, size=n_meds, dtype=np.uint64))
+    doses = doses.astype(np.float64)
+
+    # Each day should be an independent 75% draw across medications
+    assert np.allclose(doses.mean(axis=0), 0.75, atol=0.005)
+    for lag in (1, 2):
+        for day in range(n_days):
+            corr = np.corrcoef(doses[:-lag, day], doses[lag:, day])[0, 1]
+            assert abs(corr) < 0.015
+
+
+def test_populate_synthetic_data_numba_path(dashboard, monkeypatch):
+    pytest.importorskip('numba')
+    monkeypatch.setattr('pharmacovigilance_dashboard.NUMBA_MIN_ADHERENCE_ROWS', 0)
+    dashboard.populate_synthetic_data(n_patients=20, use_numba=True)
+
+    doses = dashboard.cursor.execute('SELECT DISTINCT doses_taken FROM adherence').fetchall()
+    assert set(doses) <= {(0,), (1,)}
+
+
+def test_refresh_adherence_summary_picks_up_writes(dashboard):
+    dashboard.populate_synthetic_data(n_patients=20)
+    dashboard.cursor.execute('UPDATE adherence SET doses_taken = 0 WHERE patient_id < 5')
+    dashboard.refresh_adherence_summary()
+
+    df = dashboard.analyze_adherence_trends()
+    assert (df.loc[df['patient_id'] < 5, 'avg_adherence'] == 0).all()
+    assert (df.loc[df['patient_id'] < 5, 'adherence_category'] == 'Poor').all()
+
+
+def test_lookup_tables_seeded_on_initialize(dashboard):
+    assert dashboard.cursor.execute('SELECT COUNT(*) FROM conditions').fetchone() == (4,)
+    assert dashboard.cursor.execute('SELECT COUNT(*) FROM drugs').fetchone() == (5,)
+
+
+def test_analyze_adherence_trends_patient_without_condition(dashboard):
+    dashboard.cursor.execute('''
+        INSERT INTO patients (patient_id, age, gender, condition_id, registration_date)
+        VALUES (999, 40, 'F', NULL, 0)
+    ''')
+    dashboard.populate_synthetic_data(n_patients=10)
+
+    df = dashboard.analyze_adherence_trends()
+    assert len(df) == 11
+    assert df.loc[df['patient_id'] == 999, 'chronic_condition'].isna().all()
+
+
+def test_populate_synthetic_data_ignores_numba_by_default(dashboard, monkeypatch):
+    def fail():
+        raise AssertionError('Numba kernel requested without use_numba')
+
+    monkeypatch.setattr('pharmacovigilance_dashboard.NUMBA_MIN_ADHERENCE_ROWS', 0)
+    monkeypatch.setattr('pharmacovigilance_dashboard._numba_dose_kernel', fail)
+    dashboard.populate_synthetic_data(n_patients=20)
+
+
+def test_is_headless_backend(monkeypatch):
+    import matplotlib
+    import matplotlib.backends
+    from pharmacovigilance_dashboard import _is_headless_backend
+
+    monkeypatch.setattr(matplotlib, 'get_backend', lambda: 'svg')
+    assert _is_headless_backend()
+
+    # Older matplotlib without the backend registry falls back to rcsetup
+    monkeypatch.delattr(matplotlib.backends, 'backend_registry', raising=False)
+    monkeypatch.setattr(matplotlib.rcsetup, 'non_interactive_bk', ['agg', 'svg'], raising=False)
+    assert _is_headless_backend()
+    monkeypatch.setattr(matplotlib, 'get_backend', lambda: 'TkAgg')
+    assert not _is_headless_backend()